@@ -0,0 +1,143 @@
+# cython: language_level=3str, auto_pickle=False
+'''
+BaseDataModel热点方法的Cython实现，逻辑与base_model._PyBaseDataModelImpl保持一致，
+使用base_model._prepare_class生成的_setattr_kind、_serializers。
+未编译或IMPL_VERSION与base_model不一致时base_model使用纯Python实现。
+
+编译: cythonize -i model/_base_model_fast.pyx
+一致性检查: python -m unittest tests.test_base_model_fast
+'''
+from cpython.dict cimport PyDict_GetItem
+from cpython.object cimport PyObject, PyObject_GenericSetAttr
+
+cdef extern from "Python.h":
+    # 出错时返回非0(不一定是-1)并设置RecursionError
+    int Py_EnterRecursiveCall(const char *where) noexcept
+    void Py_LeaveRecursiveCall() noexcept
+
+# 与base_model._FAST_IMPL_VERSION一致时才会被使用，修改时两处同时+1
+IMPL_VERSION = 3
+
+
+# 与base_model中的_FIELD_*一致
+cdef enum:
+    _FIELD_FREE = 0
+    _FIELD_SAME_TYPE = 1
+    _FIELD_TYPE_CLASS = 2
+    _FIELD_NESTED_MODEL = 3
+    _FIELD_LIMITED_MODEL = 4
+    _FIELD_BASE_VALUE = 5
+    _FIELD_RESERVED = 6
+
+# 与base_model中的_SERIALIZE_*一致
+cdef enum:
+    _SERIALIZE_SCALAR = 1
+    _SERIALIZE_LIST = 2
+    _SERIALIZE_VALUE_MODEL = 3
+    _SERIALIZE_MODEL = 4
+
+cdef frozenset _SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+
+# 由base_model.bind传入，避免循环导入
+cdef object BaseValueModel = None
+
+
+def bind(base_value_model):
+    '''base_model加载完成后传入依赖的类'''
+    global BaseValueModel
+    BaseValueModel = base_value_model
+
+
+cdef inline int _enter_recursive_call() except -1:
+    '''C函数间的递归不经过解释器的递归检查，需要手动计数，超过sys.getrecursionlimit()时抛出RecursionError'''
+    if Py_EnterRecursiveCall(" while serializing BaseDataModel"):
+        return -1
+    return 0
+
+
+cdef object _serialize(object v):
+    '''base_model._serialize'''
+    cdef type t = type(v)
+    if t in _SCALAR_TYPES:
+        return v
+    elif t is type:
+        raise ValueError(f"Type Check Error: {v}")
+    _enter_recursive_call()
+    try:
+        if isinstance(v, _BaseDataModelImpl):
+            return v._to_dict_fast()
+        elif isinstance(v, list):
+            return [_serialize(p) for p in v]
+        elif isinstance(v, dict):
+            return {_k: _serialize(_v) for _k, _v in v.items()}
+        elif isinstance(v, BaseValueModel):
+            return _serialize(v.value())
+        return v
+    finally:
+        Py_LeaveRecursiveCall()
+
+
+cdef class _BaseDataModelImpl:
+    '''BaseDataModel的热点方法'''
+
+    def __setattr__(self, key, value):
+        cls = type(self)
+        if cls.DATA_DEFAULT_FORMAT is not cls._prepared_format:
+            cls._prepare_class()
+        cdef dict setattr_kind = cls._setattr_kind
+        cdef PyObject *field = PyDict_GetItem(setattr_kind, key)
+        if field is NULL:
+            if cls.STRICT_MODE:
+                raise RuntimeError("严格模式不支持额外字段: " + key)
+            PyObject_GenericSetAttr(self, key, value)
+            return
+        cdef tuple item = <tuple>field
+        cdef int kind = item[0]
+        _type = item[1]
+        if kind == _FIELD_SAME_TYPE:
+            if type(value) is _type:
+                PyObject_GenericSetAttr(self, key, value)
+        elif kind == _FIELD_LIMITED_MODEL:
+            if type(value) is _type:
+                PyObject_GenericSetAttr(self, key, value)
+            else:
+                getattr(self, key).apply(value)
+        elif kind == _FIELD_TYPE_CLASS:
+            if type(value) is type or isinstance(value, _type):
+                PyObject_GenericSetAttr(self, key, value)
+        elif kind == _FIELD_NESTED_MODEL:
+            if type(value) is _type or isinstance(value, _BaseDataModelImpl):
+                PyObject_GenericSetAttr(self, key, value)
+        elif kind == _FIELD_RESERVED:
+            raise RuntimeError("不允许formatter覆盖cls方法: %s" % key)
+        else:
+            PyObject_GenericSetAttr(self, key, value)
+
+    def _to_dict_fast(self):
+        '''按类创建时生成的_serializers转换，不生成路径信息'''
+        cls = type(self)
+        if cls.DATA_DEFAULT_FORMAT is not cls._prepared_format:
+            cls._prepare_class()
+        cdef dict serializers = cls._serializers
+        cdef dict result = {}
+        cdef PyObject *field
+        cdef int kind
+        for k, v in self.__dict__.items():
+            field = PyDict_GetItem(serializers, k)
+            if field is not NULL and type(v) is (<tuple>field)[1]:
+                kind = (<tuple>field)[0]
+                if kind == _SERIALIZE_SCALAR:
+                    result[k] = v
+                elif kind == _SERIALIZE_LIST:
+                    result[k] = [_serialize(p) for p in v]
+                elif kind == _SERIALIZE_VALUE_MODEL:
+                    result[k] = _serialize(v.value())
+                else:
+                    _enter_recursive_call()
+                    try:
+                        result[k] = v._to_dict_fast()
+                    finally:
+                        Py_LeaveRecursiveCall()
+            else:
+                result[k] = _serialize(v)
+        return result
@@ -1,10 +1,39 @@
+import collections
 import datetime
 import copy
+import functools
 import json
+import operator
+import sys
+import warnings
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 与_base_model_fast.IMPL_VERSION一致时才使用Cython实现，修改_PyBaseDataModelImpl或其使用的表时两处同时+1
+_FAST_IMPL_VERSION = 3
+
+try:
+    from . import _base_model_fast
+except ImportError:
+    _base_model_fast = None
+else:
+    if getattr(_base_model_fast, "IMPL_VERSION", None) != _FAST_IMPL_VERSION:
+        warnings.warn("model._base_model_fast与base_model版本不一致，需要重新编译。当前使用纯Python实现", RuntimeWarning)
+        _base_model_fast = None
 
 
 class BaseValueModel(object):
     '''自定义 值类型。用于将所有数据转换成JSON支持的数据格式'''
+    __slots__ = ()
+
     # apply 运用在赋予初始值，以及后续校验
     def apply(self, value):
         '''转变方式'''
@@ -15,7 +44,45 @@ class BaseValueModel(object):
         raise NotImplemented("未实现value方法")
 
 
+def _make_proxy(name):
+    '''生成转发到default_value同名属性的描述符'''
+    return property(operator.attrgetter("default_value." + name))
+
+
+# 可直接复用的不可变值(包括type)，无需拷贝
+_IMMUTABLE_TYPES = (type(None), bool, int, float, complex, str, bytes, type,
+                    datetime.date, datetime.time, datetime.timedelta)
+
+
+@functools.lru_cache(maxsize=None)
+def _slot_descriptors(cls):
+    '''cls及其父类__slots__中定义的属性 -> ((getter, setter), ...)'''
+    descriptors = []
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get("__slots__", ())
+        for name in ((slots,) if isinstance(slots, str) else slots):
+            if name not in ("__dict__", "__weakref__"):
+                if name.startswith("__") and not name.endswith("__") and klass.__name__.lstrip("_"):
+                    # 私有名称改写: __x -> _Cls__x
+                    name = "_%s%s" % (klass.__name__.lstrip("_"), name)
+                descriptor = klass.__dict__[name]
+                descriptors.append((descriptor.__get__, descriptor.__set__))
+    return tuple(descriptors)
+
+
 class LimitedValueModel(BaseValueModel):
+    __slots__ = ("default_value",)
+
+    def __init_subclass__(cls, value_cls=None, **kwargs):
+        '''
+        :param value_cls: 值的类型。value_cls的公有属性直接转发到default_value，不再经过__getattr__
+        '''
+        super().__init_subclass__(**kwargs)
+        if value_cls is not None:
+            for name in dir(value_cls):
+                if not name.startswith("_") and not hasattr(cls, name):
+                    setattr(cls, name, _make_proxy(name))
+
     def __init__(self, default_value):
         self.default_value = default_value
 
@@ -26,7 +93,26 @@ class LimitedValueModel(BaseValueModel):
     def value(self):
         return self.default_value
 
+    def clone(self):
+        '''浅拷贝，default_value为list/dict时逐层复制。代替deepcopy'''
+        cls = self.__class__
+        new = object.__new__(cls)
+        for getter, setter in _slot_descriptors(cls):
+            try:
+                setter(new, getter(self, cls))
+            except AttributeError:
+                # 未赋值的slot
+                pass
+        if cls.__dictoffset__:
+            # 未定义__slots__的子类
+            new.__dict__.update({k: _clone_value(v) for k, v in self.__dict__.items()})
+        default_value = self.default_value
+        if not isinstance(default_value, _IMMUTABLE_TYPES):
+            new.default_value = _clone_value(default_value)
+        return new
+
     def __getattr__(self, item):
+        # 慢速路径：未通过value_cls生成转发的属性
         # if "value" in self.__dict__:
         #     return super().__getattribute__("value")
         # print(item)
@@ -41,6 +127,14 @@ class LimitedValueModel(BaseValueModel):
     def __eq__(self, other):
         return self.value().__eq__(other)
 
+    def __hash__(self):
+        # 定义__eq__后__hash__默认为None。按default_value计算(不调用value()，避免校验失败或随时间变化)，不可hash时按对象区分
+        # value()与default_value不同的子类(DateTimeValueModel等)设置__hash__ = None
+        try:
+            return hash(self.default_value)
+        except TypeError:
+            return id(self)
+
     def __lt__(self, other):
         return self.value().__lt__(other)
 
@@ -63,13 +157,35 @@ class LimitedValueModel(BaseValueModel):
         return len(self.value())
 
 
+class StringLimitedValueModel(LimitedValueModel, value_cls=str):
+    '''str值类型'''
+    __slots__ = ()
+
+
+class IntLimitedValueModel(LimitedValueModel, value_cls=int):
+    '''int值类型'''
+    __slots__ = ()
+
+
+class FloatLimitedValueModel(LimitedValueModel, value_cls=float):
+    '''float值类型'''
+    __slots__ = ()
+
+
+class ListLimitedValueModel(LimitedValueModel, value_cls=list):
+    '''list值类型'''
+    __slots__ = ()
+
+
 class BetweenValueModel(LimitedValueModel):
     '''值范围限制'''
-    pass
+    __slots__ = ()
 
 
 class ComplexValueModel(LimitedValueModel):
     '''更复杂的值类型约束'''
+    __slots__ = ("required",)
+
     def __init__(self, default_value=None, required=False):
         self.required = required
         super().__init__(default_value)
@@ -81,9 +197,42 @@ class ComplexValueModel(LimitedValueModel):
         return self.default_value
 
 
+# strptime格式 -> (长度, ((位置, 分隔符), ...))。字符串满足时可用fromisoformat代替strptime
+_ISO_FORMATS = {
+    "%Y-%m-%d": (10, ((4, "-"), (7, "-"))),
+    "%Y-%m-%d %H:%M:%S": (19, ((4, "-"), (7, "-"), (10, " "), (13, ":"), (16, ":"))),
+    "%Y-%m-%dT%H:%M:%S": (19, ((4, "-"), (7, "-"), (10, "T"), (13, ":"), (16, ":"))),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _make_parser(formatter):
+    '''生成formatter对应的时间解析函数，每个formatter只生成一次'''
+    strptime = datetime.datetime.strptime
+    iso = _ISO_FORMATS.get(formatter)
+    if iso is None:
+        return lambda value: strptime(value, formatter)
+    size, separators = iso
+    fromisoformat = datetime.datetime.fromisoformat
+
+    def _parse(value):
+        # 长度与分隔符都一致时，fromisoformat与strptime结果相同
+        if len(value) == size and all(value[i] == c for i, c in separators):
+            try:
+                return fromisoformat(value)
+            except ValueError:
+                pass
+        return strptime(value, formatter)
+    return _parse
+
+
 class DateTimeValueModel(ComplexValueModel):
+    __slots__ = ("formatter", "_formatted")
+    __hash__ = None # value()是格式化后的字符串，未赋值时随当前时间变化
+
     def __init__(self, formatter, default_value=None, required=False):
         self.formatter = formatter
+        self._formatted = None # 上一次格式化的 (datetime, formatter, 结果)
         super().__init__(default_value, required)
 
     def apply(self, value):
@@ -91,7 +240,7 @@ class DateTimeValueModel(ComplexValueModel):
             self.default_value = value
             return value
         elif isinstance(value, str):
-            self.default_value = datetime.datetime.strptime(value, self.formatter)
+            self.default_value = _make_parser(self.formatter)(value)
             return value
         else:
             raise NotImplemented("不支持")
@@ -101,12 +250,20 @@ class DateTimeValueModel(ComplexValueModel):
         if dt:
             assert isinstance(dt, datetime.datetime), "非期望值类型"
         else:
-            dt = datetime.datetime.now()
-        return dt.strftime(self.formatter)
+            return datetime.datetime.now().strftime(self.formatter)
+        formatted = self._formatted
+        if formatted is not None and formatted[0] is dt and formatted[1] == self.formatter:
+            return formatted[2]
+        text = dt.strftime(self.formatter)
+        self._formatted = (dt, self.formatter, text)
+        return text
 
 
 class DateTimeIntValueModel(ComplexValueModel):
     '''默认时间戳 取10位'''
+    __slots__ = ()
+    __hash__ = None # value()是时间戳，未赋值时随当前时间变化
+
     def apply(self, value):
         if isinstance(value, datetime.datetime):
             self.default_value = value
@@ -128,6 +285,8 @@ class DateTimeIntValueModel(ComplexValueModel):
 
 class FixedValueModel(ComplexValueModel):
     '''支持None. FixedValueModel(value_cls=str) 与 "" 不同在于，后者可以为None'''
+    __slots__ = ("value_cls",)
+
     def __init__(self, default_value=None, required=False, value_cls=None):
         self.value_cls = value_cls
         super().__init__(default_value, required)
@@ -139,6 +298,8 @@ class FixedValueModel(ComplexValueModel):
 
 
 class ListComplexValueModel(ComplexValueModel):
+    __slots__ = ("need_size", "value_cls", "support_dict_value")
+
     def __init__(self, default_value=None, required=False, need_size=False, value_cls=None, support_dict_value=False):
         '''
         列表约束条件
@@ -160,51 +321,102 @@ class ListComplexValueModel(ComplexValueModel):
         assert isinstance(tmp_value, list), "非List类型"
         if self.required and self.need_size:
             assert len(tmp_value) > 0, "值约束条件不满足"
-        if self.value_cls and tmp_value:
+        value_cls = self.value_cls
+        if value_cls and tmp_value:
+            is_model = isinstance(value_cls, type) and issubclass(value_cls, BaseDataModel)
             for index, k in enumerate(tmp_value):
-                if not isinstance(k, self.value_cls):
-                    if isinstance(k, dict) and isinstance(self.value_cls(), BaseDataModel):
+                if not isinstance(k, value_cls):
+                    if is_model and isinstance(k, dict):
                         if self.support_dict_value:
                             return tmp_value
-                        s0 = sorted(k.keys())
-                        s1 = sorted(self.value_cls.DATA_DEFAULT_FORMAT.keys())
-                        if self.value_cls.STRICT_MODE:
-                            if s0 == s1:
+                        format_keys = value_cls._prepared()._format_keys
+                        if value_cls.STRICT_MODE:
+                            if k.keys() == format_keys:
                                 return tmp_value
                         else:
-                            if s1 in s0:
+                            if k.keys() >= format_keys:
                                 return tmp_value
                             else:
                                 # 少于DATA_DEFAULT_FORMAT情况，要判断是否为required字段。暂时不支持
                                 pass
-                    assert False, f"{index} 不符合数据格式要求 {self.value_cls}"
+                    assert False, f"{index} 不符合数据格式要求 {value_cls}"
         return tmp_value
 
     def __repr__(self):
         return super().__repr__() + " value_cls: %s" % repr(self.value_cls)
 
 
+def _in_range(arr, lo, hi):
+    '''lo <= arr <= hi 的布尔掩码'''
+    return (arr >= lo) & (arr <= hi)
+
+
+@functools.lru_cache(maxsize=None)
+def _jit_in_range():
+    '''首次批量校验时才导入numba并编译_in_range，numba不可用时返回None'''
+    try:
+        import numba
+    except ImportError:
+        return None
+    return numba.njit(cache=True, parallel=True)(_in_range)
+
+
+def _fits_dtype(value, dtype):
+    '''value(int/float)可以无损转换为dtype。numba按dtype编译，超出范围的int(如2**70)无法编译'''
+    return type(value) in (int, float) and numpy.can_cast(numpy.min_scalar_type(value), dtype)
+
+
+def _batch_in_range(arr, lo, hi):
+    '''数值列(int/uint/float)且范围可用该dtype表示时使用numba，其他情况(object、str、datetime等)使用numpy'''
+    if arr.dtype.kind in "iuf" and _fits_dtype(lo, arr.dtype) and _fits_dtype(hi, arr.dtype):
+        jit_in_range = _jit_in_range()
+        if jit_in_range is not None:
+            return jit_in_range(arr, lo, hi)
+    return _in_range(arr, lo, hi)
+
+
 class NumberBetweenValueModel(BetweenValueModel):
     '''
     存在数字范围的 值类型
     '''
+    __slots__ = ("min", "max")
+
     def __init__(self, default_value, min_value, max_value):
         self.min = min_value
         self.max = max_value
         super().__init__(default_value)
 
     def apply(self, value):
-        if self.min <= value <= self.min:
+        if self.min <= value <= self.max:
             self.default_value = value
             return value
         else:
             raise ValueError(f"数据值超出范围: [%s, %s] value: %s" % (self.min, self.max, value))
 
+    def apply_batch(self, values):
+        '''
+        批量校验范围，不修改default_value。用于整列数据导入
+        :param values: numpy.ndarray 或 可迭代对象
+        :return: values
+        '''
+        if numpy is None:
+            for value in values:
+                if not self.min <= value <= self.max:
+                    raise ValueError("数据值超出范围: [%s, %s] value: %s" % (self.min, self.max, value))
+            return values
+        arr = numpy.asarray(values)
+        mask = _batch_in_range(arr, self.min, self.max)
+        if not mask.all():
+            raise ValueError("数据值超出范围: [%s, %s] value: %s" % (self.min, self.max, arr[~mask][0]))
+        return values
+
 
 class ListBetweenValueModel(BetweenValueModel):
     '''
     存在List中的 值类型
     '''
+    __slots__ = ("value_list",)
+
     def __init__(self, default_value, value_list):
         self.value_list = value_list
         super().__init__(default_value)
@@ -220,16 +432,276 @@ class ListBetweenValueModel(BetweenValueModel):
             raise ValueError("数据值超出范围: %s value:%s" % (self.value_list, value))
 
 
-class BaseDataModel(object):
+def _clone_value(value):
+    '''递归浅拷贝：不可变值直接复用，list/dict逐层复制，值模型使用clone，其他deepcopy'''
+    if isinstance(value, _IMMUTABLE_TYPES):
+        return value
+    elif type(value) is list:
+        return [_clone_value(v) for v in value]
+    elif type(value) is dict:
+        return {k: _clone_value(v) for k, v in value.items()}
+    elif isinstance(value, LimitedValueModel):
+        return value.clone()
+    return copy.deepcopy(value)
+
+
+def _make_copier(value):
+    '''
+    生成DATA_DEFAULT_FORMAT中值的拷贝函数，代替每次实例化时的deepcopy
+    :param value: DATA_DEFAULT_FORMAT中的值
+    :return: 无参拷贝函数。不可变值返回None，代表直接复用
+    '''
+    if isinstance(value, _IMMUTABLE_TYPES):
+        return None
+    elif type(value) is dict:
+        copiers = [(k, fn) for k, fn in ((k, _make_copier(v)) for k, v in value.items()) if fn is not None]
+        if not copiers:
+            return value.copy
+
+        def _copy_dict():
+            data = value.copy()
+            for k, fn in copiers:
+                data[k] = fn()
+            return data
+        return _copy_dict
+    elif type(value) is list:
+        copiers = [_make_copier(v) for v in value]
+        if not any(copiers):
+            return value.copy
+        return lambda: [v if fn is None else fn() for v, fn in zip(value, copiers)]
+    elif isinstance(value, LimitedValueModel):
+        return value.clone
+    return functools.partial(copy.deepcopy, value)
+
+
+# DATA_DEFAULT_FORMAT中字段的赋值方式
+_FIELD_FREE = 0 # None，直接赋值
+_FIELD_SAME_TYPE = 1 # 基本数据类型，只接收同类型的值
+_FIELD_TYPE_CLASS = 2 # type，接收该类型的值
+_FIELD_NESTED_MODEL = 3 # dict，接收dict或BaseDataModel
+_FIELD_LIMITED_MODEL = 4 # LimitedValueModel，通过apply赋值
+_FIELD_BASE_VALUE = 5 # BaseValueModel，直接赋值
+_FIELD_RESERVED = 6 # 类的保留名称，不允许赋值
+
+
+def _intern(key):
+    '''DATA_DEFAULT_FORMAT的key可能是动态拼接的字符串，统一intern'''
+    return sys.intern(key) if type(key) is str else key
+
+
+def _classify_field(value):
+    '''DATA_DEFAULT_FORMAT中的值 -> (赋值方式, 类型)'''
+    if value is None:
+        return _FIELD_FREE, None
+    elif type(value) is type:
+        return _FIELD_TYPE_CLASS, value
+    elif isinstance(value, dict):
+        return _FIELD_NESTED_MODEL, type(value)
+    elif isinstance(value, LimitedValueModel):
+        return _FIELD_LIMITED_MODEL, type(value)
+    elif isinstance(value, BaseValueModel):
+        return _FIELD_BASE_VALUE, type(value)
+    return _FIELD_SAME_TYPE, type(value)
+
+
+def _fmt_trace(trace):
+    '''
+    路径信息只在出错时生成
+    :param trace: 根路径字符串，或 (父路径, 格式, 参数)
+    :return: e.g. self.lst[0]
+    '''
+    segments = []
+    while isinstance(trace, tuple):
+        trace, fmt, arg = trace
+        segments.append((fmt, arg))
+    text = trace
+    for fmt, arg in reversed(segments):
+        text = fmt % (text, arg)
+    return text
+
+
+# default_value: 值的类型 -> 默认值
+_VALUE_DEFAULTS = {
+    str: lambda v: "",
+    int: lambda v: 0,
+    bool: lambda v: 0,
+    float: lambda v: 0.0,
+    list: lambda v: [],
+    datetime.datetime: lambda v: datetime.datetime.now(),
+}
+
+# default_value: Type/Class -> 默认值
+_TYPE_DEFAULTS = {str: str, int: int, bool: bool, float: float, list: list, dict: dict}
+
+
+# 可直接作为JSON值的类型
+_SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+
+
+def _serialize(v):
+    '''_to_dict的快速版本，不生成路径信息。出错时由_to_dict重新遍历定位'''
+    if type(v) in _SCALAR_TYPES:
+        return v
+    elif type(v) == type:
+        raise ValueError(f"Type Check Error: {v}")
+    elif isinstance(v, BaseDataModel):
+        return v._to_dict_fast()
+    elif isinstance(v, list):
+        return [_serialize(p) for p in v]
+    elif isinstance(v, dict):
+        return {_k: _serialize(_v) for _k, _v in v.items()}
+    elif isinstance(v, BaseValueModel):
+        return _serialize(v.value())
+    return v
+
+
+# _to_dict_fast中按DATA_DEFAULT_FORMAT确定的转换方式。值的类型与记录的类型不一致时使用_serialize
+_SERIALIZE_SCALAR = 1 # 基本数据类型，直接返回
+_SERIALIZE_LIST = 2 # list，逐个_serialize
+_SERIALIZE_VALUE_MODEL = 3 # 值模型，_serialize(value())
+_SERIALIZE_MODEL = 4 # BaseDataModel子类，_to_dict_fast
+
+
+def _classify_serializer(kind, _type):
+    '''(赋值方式, 类型) -> (转换方式, 类型)，无法确定时返回None'''
+    if kind == _FIELD_SAME_TYPE or kind == _FIELD_TYPE_CLASS:
+        if _type in _SCALAR_TYPES:
+            return _SERIALIZE_SCALAR, _type
+        elif _type is list:
+            return _SERIALIZE_LIST, _type
+        elif kind == _FIELD_TYPE_CLASS and issubclass(_type, BaseDataModel):
+            return _SERIALIZE_MODEL, _type
+    elif kind == _FIELD_LIMITED_MODEL or kind == _FIELD_BASE_VALUE:
+        return _SERIALIZE_VALUE_MODEL, _type
+    return None
+
+
+# datetime/dataclass交给default处理(抛出TypeError)，与json的行为一致。
+# 不使用OPT_NON_STR_KEYS：dict存在非str的key时orjson抛出TypeError，交给json处理(int等转为字符串，datetime等抛出TypeError)
+_ORJSON_OPTIONS = 0 if orjson is None else (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+
+
+def _orjson_default(v):
+    '''orjson.dumps的default回调'''
+    if isinstance(v, BaseDataModel):
+        return v.__dict__
+    elif isinstance(v, BaseValueModel):
+        return v.value()
+    raise TypeError
+
+
+class _PyBaseDataModelImpl(object):
+    '''BaseDataModel的热点方法。纯Python实现，_base_model_fast编译后由其中的Cython实现代替'''
+
+    def __setattr__(self, key, value):
+        # _value = getattr(self, key) if hasattr(self, key) else None
+        cls = self.__class__
+        if cls.DATA_DEFAULT_FORMAT is not cls._prepared_format:
+            cls._prepare_class()
+        field = cls._setattr_kind.get(key)
+        if field is None:
+            if cls.STRICT_MODE:
+                raise RuntimeError("严格模式不支持额外字段: " + key)
+            super().__setattr__(key, value)
+            return
+        kind, _type = field
+        if kind == _FIELD_SAME_TYPE:
+            # 同一个类型
+            if type(value) is _type:
+                super().__setattr__(key, value)
+        elif kind == _FIELD_LIMITED_MODEL:
+            if type(value) is _type:
+                super().__setattr__(key, value)
+            else:
+                getattr(self, key).apply(value)
+        elif kind == _FIELD_TYPE_CLASS:
+            # 属于_value类型
+            if type(value) is type or isinstance(value, _type):
+                super().__setattr__(key, value)
+        elif kind == _FIELD_NESTED_MODEL:
+            # 对于dict类型代表直接赋值
+            if type(value) is _type or isinstance(value, BaseDataModel):
+                super().__setattr__(key, value)
+        elif kind == _FIELD_RESERVED:
+            raise RuntimeError("不允许formatter覆盖cls方法: %s" % key)
+        else:
+            # _FIELD_FREE、_FIELD_BASE_VALUE 直接赋值，本来BaseValueModel就是个影子对象
+            super().__setattr__(key, value)
+
+    def _to_dict_fast(self):
+        '''按类创建时生成的_serializers转换，不生成路径信息'''
+        cls = self.__class__
+        if cls.DATA_DEFAULT_FORMAT is not cls._prepared_format:
+            cls._prepare_class()
+        serializers = cls._serializers
+        result = {}
+        for k, v in self.__dict__.items():
+            field = serializers.get(k)
+            if field is not None and type(v) is field[1]:
+                kind = field[0]
+                if kind == _SERIALIZE_SCALAR:
+                    result[k] = v
+                elif kind == _SERIALIZE_LIST:
+                    result[k] = [_serialize(p) for p in v]
+                elif kind == _SERIALIZE_VALUE_MODEL:
+                    result[k] = _serialize(v.value())
+                else:
+                    result[k] = v._to_dict_fast()
+            else:
+                result[k] = _serialize(v)
+        return result
+
+
+# 优先使用Cython实现
+_BaseDataModelImpl = _PyBaseDataModelImpl if _base_model_fast is None else _base_model_fast._BaseDataModelImpl
+
+
+class BaseDataModel(_BaseDataModelImpl):
 
     DATA_DEFAULT_FORMAT = {} # DATA_DEFAULT_FORMAT的values解释：{}代表BaseDataModel、type代表严格要求、其他基本数据类型有默认值0
+    # 类创建时按DATA_DEFAULT_FORMAT预先计算字段表。类创建后可以整体重新赋值(读取字段表时重新计算)，不支持原地修改
 
     STRICT_MODE = False # 严格模式。 是否接收额外DATA_DEFAULT_FORMAT中未定义的key
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._prepare_class()
+
+    @classmethod
+    def _prepare_class(cls):
+        '''类创建时预先计算的内容'''
+        cls._reserved_names = frozenset(dir(cls))
+        cls._format_keys = frozenset(cls.DATA_DEFAULT_FORMAT)
+        # key使用intern后的字符串，setattr传入的key同样是intern过的，查找时可直接比较指针
+        cls._field_kind = {_intern(k): _classify_field(v) for k, v in cls.DATA_DEFAULT_FORMAT.items()}
+        # __setattr__只查找一次：DATA_DEFAULT_FORMAT字段 + 保留名称
+        cls._setattr_kind = dict(cls._field_kind)
+        cls._setattr_kind.update(dict.fromkeys(cls._reserved_names, (_FIELD_RESERVED, None)))
+        cls._equals_ignore_keys = frozenset(cls.EQUALS_IGNORE_KEYS)
+        # 默认值工厂。每个类都重新生成，不会沿MRO使用父类的结果
+        cls._factory = _make_copier({_intern(k): v for k, v in cls.DATA_DEFAULT_FORMAT.items()})
+        # _to_dict_fast使用：key -> (转换方式, 类型)
+        cls._serializers = {}
+        for k, (kind, _type) in cls._field_kind.items():
+            field = _classify_serializer(kind, _type)
+            if field is not None:
+                cls._serializers[k] = field
+        # 计算时使用的对象。读取上述字段表前与当前的类属性比较，被重新赋值时重新计算
+        cls._prepared_format = cls.DATA_DEFAULT_FORMAT
+        cls._prepared_ignore_keys = cls.EQUALS_IGNORE_KEYS
+
+    @classmethod
+    def _prepared(cls):
+        '''类创建后重新赋值了DATA_DEFAULT_FORMAT/EQUALS_IGNORE_KEYS时重新计算字段表，返回cls'''
+        if cls.DATA_DEFAULT_FORMAT is not cls._prepared_format or cls.EQUALS_IGNORE_KEYS is not cls._prepared_ignore_keys:
+            cls._prepare_class()
+        return cls
+
     def __init__(self, **kwargs):
+        cls = self.__class__._prepared()
         # 检查self.DATA_DEFAULT_FORMAT 不能是禁止的方法
         self._check_key_format(self.DATA_DEFAULT_FORMAT)
-        data_formatter = copy.deepcopy(self.DATA_DEFAULT_FORMAT)
+        data_formatter = cls._factory()
         self.__dict__.update(**self.pre_new(data_formatter))
         self.update(kwargs)
 
@@ -245,19 +717,24 @@ class BaseDataModel(object):
         :param value:
         :return:
         '''
-        if isinstance(value, str) or isinstance(value, str.__class__):
+        fn = _VALUE_DEFAULTS.get(type(value))
+        if fn is not None:
+            return fn(value)
+        elif isinstance(value, type):
+            fn = _TYPE_DEFAULTS.get(value)
+            return fn() if fn is not None else None
+        elif isinstance(value, dict):
+            for k, v in value.items():
+                value[k] = cls.default_value(v)
+            return value
+        # 以下为子类实例
+        elif isinstance(value, str):
             return ""
-        elif isinstance(value, list) or isinstance(value, list.__class__):
+        elif isinstance(value, list):
             return []
-        elif isinstance(value, dict) or isinstance(value, dict.__class__):
-            if isinstance(value, dict):
-                for k, v in value.items():
-                    value[k] = cls.default_value(v)
-                return value
-            return {}
-        elif isinstance(value, int) or isinstance(value, int.__class__):
+        elif isinstance(value, int):
             return 0
-        elif isinstance(value, float) or isinstance(value, float.__class__):
+        elif isinstance(value, float):
             return 0.0
         elif isinstance(value, datetime.datetime):
             return datetime.datetime.now()
@@ -269,35 +746,9 @@ class BaseDataModel(object):
     @classmethod
     def _check_key_format(cls, formatter):
         '''限制自定义key影响正常使用'''
-        if not hasattr(cls, "_keys_limited"):
-            cls._keys_limited = dir(cls)
-        key_dirs = cls._keys_limited
-        for _key in key_dirs:
-            if (isinstance(formatter, dict) and _key in formatter) or (isinstance(formatter, str) and _key == formatter):
-                raise RuntimeError("不允许formatter覆盖cls方法: %s" % formatter)
-
-    def __setattr__(self, key, value):
-        # _value = getattr(self, key) if hasattr(self, key) else None
-        self._check_key_format(key)
-        if self.STRICT_MODE:
-            if key not in self.DATA_DEFAULT_FORMAT:
-                raise RuntimeError("严格模式不支持额外字段: " + key)
-        _value = self.DATA_DEFAULT_FORMAT.get(key)
-        if _value is not None:
-            if type(_value) == type(value):
-                # 同一个类型
-                super().__setattr__(key, value)
-            elif type(_value) == type and isinstance(value, _value):
-                # 属于_value类型
-                super().__setattr__(key, value)
-            elif isinstance(_value, dict) and isinstance(value, BaseDataModel): # 对于dict类型代表直接赋值
-                super().__setattr__(key, value)
-            elif isinstance(_value, LimitedValueModel):
-                getattr(self, key).apply(value)
-            elif isinstance(_value, BaseValueModel): # 直接赋值，本来BaseValueModel就是个影子对象
-                super().__setattr__(key, value)
-        else:
-            super().__setattr__(key, value)
+        key_dirs = cls._reserved_names
+        if (isinstance(formatter, dict) and not key_dirs.isdisjoint(formatter)) or (isinstance(formatter, str) and formatter in key_dirs):
+            raise RuntimeError("不允许formatter覆盖cls方法: %s" % formatter)
 
     # 温和更新
     def update(self, dict_value):
@@ -329,83 +780,128 @@ class BaseDataModel(object):
     #     return super().__getattribute__(item)
 
     @classmethod
-    def _check_value(cls, k, v):
-        '''数据验证/检查方法'''
-        if type(v) == type:
-            raise ValueError(f"Value Check Error: {k}:{v}")
-        elif isinstance(v, BaseDataModel):
-            v._check_value("%s(%s)" % (k, v.__class__.__name__), v.__dict__)
-        elif isinstance(v, list):
-            for i, p in enumerate(v):
-                cls._check_value("%s[%s]" % (k, i), p)
-        elif isinstance(v, dict):
-            for _k, _v in v.items():
-                cls._check_value("%s.%s" % (k, _k), _v)
-        elif k in cls.DATA_DEFAULT_FORMAT and isinstance(cls.DATA_DEFAULT_FORMAT[k], BaseValueModel):
-            cls.DATA_DEFAULT_FORMAT[k].apply(v)
-        elif isinstance(v, LimitedValueModel):
-            v.value()
+    def _to_dict(cls, k, v):
+        '''转换成类JSON的dict对象。使用栈代替递归，结果写入 container[slot]；嵌套超过递归上限时抛出RecursionError'''
+        limit = sys.getrecursionlimit()
+        root = [None]
+        stack = collections.deque([(k, v, root, 0, 0)])
+        while stack:
+            k, v, container, slot, depth = stack.pop()
+            if depth > limit:
+                raise RecursionError(f"Type Check Error: 嵌套层数超过{limit}: {_fmt_trace(k)}")
+            depth += 1
+            if type(v) == type:
+                raise ValueError(f"Type Check Error: {_fmt_trace(k)}:{v}")
+            elif isinstance(v, BaseDataModel):
+                stack.append(((k, "%s(%s)", v.__class__.__name__), v.__dict__, container, slot, depth))
+            elif isinstance(v, list):
+                tmp = container[slot] = [None] * len(v)
+                stack.extend(((k, "%s[%s]", i), v[i], tmp, i, depth) for i in range(len(v) - 1, -1, -1))
+            elif isinstance(v, dict):
+                tmp = container[slot] = {}
+                stack.extend(((k, "%s.%s", _k), _v, tmp, _k, depth) for _k, _v in reversed(v.items()))
+            elif isinstance(v, BaseValueModel):
+                try:
+                    stack.append((k, v.value(), container, slot, depth))
+                except AssertionError:
+                    raise ValueError(f"AssertionError: {_fmt_trace(k)}:{v}")
+            else:
+                container[slot] = v
+        return root[0]
 
     @classmethod
-    def _to_dict(cls, k, v):
-        '''转换成类JSON的dict对象'''
-        if type(v) == type:
-            raise ValueError(f"Type Check Error: {k}:{v}")
-        else:
-            try:
-                if isinstance(v, BaseDataModel):
-                    return v._to_dict("%s(%s)" % (k, v.__class__.__name__), v.__dict__)
-                elif isinstance(v, list):
-                    tmp = []
-                    for i, p in enumerate(v):
-                        tmp.append(cls._to_dict("%s[%s]" % (k, i), p))
-                    return tmp
-                elif isinstance(v, dict):
-                    tmp = {}
-                    for _k, _v in v.items():
-                        tmp[_k] = cls._to_dict("%s.%s" % (k, _k), _v)
-                    return tmp
-                elif isinstance(v, BaseValueModel):
-                    return cls._to_dict(k, v.value())
-                return v
-            except AssertionError as e:
-                raise ValueError(f"AssertionError: {k}:{v}")
+    def _check_value(cls, k, v):
+        '''数据验证/检查方法。使用栈代替递归，顺序与递归一致；嵌套超过递归上限(如自引用的list)时抛出RecursionError'''
+        limit = sys.getrecursionlimit()
+        stack = collections.deque([(cls, k, v, 0)])
+        while stack:
+            owner, k, v, depth = stack.pop()
+            if depth > limit:
+                raise RecursionError(f"Value Check Error: 嵌套层数超过{limit}: {_fmt_trace(k)}")
+            depth += 1
+            if type(v) == type:
+                raise ValueError(f"Value Check Error: {_fmt_trace(k)}:{v}")
+            elif isinstance(v, BaseDataModel):
+                stack.append((v.__class__, (k, "%s(%s)", v.__class__.__name__), v.__dict__, depth))
+            elif isinstance(v, list):
+                stack.extend((owner, (k, "%s[%s]", i), v[i], depth) for i in range(len(v) - 1, -1, -1))
+            elif isinstance(v, dict):
+                stack.extend((owner, (k, "%s.%s", _k), _v, depth) for _k, _v in reversed(v.items()))
+            elif isinstance(k, str) and k in owner.DATA_DEFAULT_FORMAT and isinstance(owner.DATA_DEFAULT_FORMAT[k], BaseValueModel):
+                owner.DATA_DEFAULT_FORMAT[k].apply(v)
+            elif isinstance(v, LimitedValueModel):
+                v.value()
 
     def check(self):
         # 检查为type则抛出异常
-        self._check_value("self", self.__dict__)
+        # 第一层直接遍历__dict__：基本类型无需检查，值模型直接校验，其余交给_check_value
+        cls = self.__class__
+        for k, v in self.__dict__.items():
+            if type(v) in _SCALAR_TYPES:
+                continue
+            elif type(v) == type:
+                raise ValueError(f"Value Check Error: self.{k}:{v}")
+            elif isinstance(v, LimitedValueModel):
+                v.value()
+            else:
+                cls._check_value(("self", "%s.%s", k), v)
         return self
 
     def to_dict(self):
-        return self._to_dict("self", self.__dict__)
+        try:
+            return self._to_dict_fast()
+        except (AssertionError, ValueError, RecursionError):
+            # 重新遍历，生成出错的路径信息。_to_dict使用栈，嵌套过深(如自引用)时抛出带路径的RecursionError
+            return self._to_dict("self", self.__dict__)
+
+    def to_bytes(self):
+        '''
+        JSON bytes。orjson可用且未覆盖to_dict时直接序列化__dict__，
+        BaseDataModel/BaseValueModel由_orjson_default转换，不生成中间dict
+        '''
+        if orjson is not None:
+            try:
+                if type(self).to_dict is BaseDataModel.to_dict:
+                    return orjson.dumps(self.__dict__, default=_orjson_default, option=_ORJSON_OPTIONS)
+                return orjson.dumps(self.to_dict(), option=_ORJSON_OPTIONS)
+            except TypeError:
+                # orjson无法处理的值：由to_dict生成出错路径，或交给json处理
+                pass
+        return json.dumps(self.to_dict()).encode()
 
     def to_json(self):
-        return json.dumps(self.to_dict())
+        '''
+        与json.dumps(self.to_dict())一致。使用orjson时的差异：
+        输出无空格且不转义非ASCII字符；NaN/Infinity输出为null；
+        uuid.UUID、enum.Enum(作为值时)由orjson直接序列化，json会抛出TypeError
+        '''
+        return self.to_bytes().decode()
 
-    EQUALS_IGNORE_KEYS = []
+    EQUALS_IGNORE_KEYS = [] # 与DATA_DEFAULT_FORMAT相同，可以整体重新赋值，不支持原地修改
 
     @classmethod
     def _equals(cls, text, a, b):
         '''比较方法。可以考虑成 a == b，未覆盖底层__equal__'''
         if isinstance(a, BaseDataModel):
-            assert sorted(list(a.__dict__.keys())) == sorted(list(b.keys())), f"{text} 数据长度不一致"
+            assert a.__dict__.keys() == b.keys(), f"{_fmt_trace(text)} 数据长度不一致"
+            ignore_keys = a.__class__._prepared()._equals_ignore_keys
             for k, v in a.__dict__.items():
-                if k not in a.EQUALS_IGNORE_KEYS:
-                    if not cls._equals("%s[%s]" % (text, k), v, b[k]):
+                if k not in ignore_keys:
+                    if not cls._equals((text, "%s[%s]", k), v, b[k]):
                         return False
             return True
         else:
-            assert type(a) == type(b), f"{text} 无法验证数据格式"
+            assert type(a) == type(b), f"{_fmt_trace(text)} 无法验证数据格式"
             if isinstance(a, dict):
-                assert sorted(list(a.keys())) == sorted(list(b.keys())), f"{text} 数据长度不一致"
+                assert a.keys() == b.keys(), f"{_fmt_trace(text)} 数据长度不一致"
                 for k, v in a.items():
-                    if not cls._equals("%s[%s]" % (text, k), v, b[k]):
+                    if not cls._equals((text, "%s[%s]", k), v, b[k]):
                         return False
                 return True
             elif isinstance(a, list):
-                assert len(a) == len(b), f"{text} 数据长度不一致"
+                assert len(a) == len(b), f"{_fmt_trace(text)} 数据长度不一致"
                 for i, v in enumerate(a):
-                    if not cls._equals("%s[%s]" % (text, i), v, b[i]):
+                    if not cls._equals((text, "%s[%s]", i), v, b[i]):
                         return False
                 return True
             else:
@@ -417,6 +913,12 @@ class BaseDataModel(object):
         return self._equals("self", self, data)
 
 
+BaseDataModel._prepare_class()
+
+if _base_model_fast is not None:
+    _base_model_fast.bind(BaseValueModel)
+
+
 class BaseStrictDataModel(BaseDataModel):
     '''严格模式数据'''
     STRICT_MODE = True
@@ -444,18 +946,46 @@ class BaseDBDataModel(BaseExtraDictDataModel):
         raise NotImplemented("未实现该方法")
 
 
+_MISSING = object()
+
+
+def _load_db_model(model, value, strict_mode):
+    '''DATA_DEFAULT_FORMAT中为BaseMGDBDataModel实例'''
+    return model.load_db_data(value, strict_mode)
+
+
+def _load_db_new_model(value, strict_mode):
+    '''DATA_DEFAULT_FORMAT中为BaseMGDBDataModel'''
+    return BaseMGDBDataModel().load_db_data(value, strict_mode)
+
+
+def _load_db_value(value, strict_mode):
+    '''直接赋值'''
+    return value
+
+
 class BaseMGDBDataModel(BaseDBDataModel):
     '''支持MongoDB互相映射'''
+    @classmethod
+    def _prepare_class(cls):
+        super()._prepare_class()
+        # 每个字段的加载方式：[(key, loader), ...]
+        plan = []
+        for k, v in cls.DATA_DEFAULT_FORMAT.items():
+            if isinstance(v, BaseMGDBDataModel):
+                plan.append((k, functools.partial(_load_db_model, v)))
+            elif v is BaseMGDBDataModel: # 存在
+                plan.append((k, _load_db_new_model))
+            else:
+                plan.append((k, _load_db_value))
+        cls._db_plan = plan
+
     def load_db_data(self, db_value, strict_mode=False):
         if isinstance(db_value, dict):
-            for k, v in self.DATA_DEFAULT_FORMAT.items():
-                if k in db_value:
-                    if isinstance(v, BaseMGDBDataModel):
-                        setattr(self, k, v.load_db_data(db_value.get(k), strict_mode))
-                    elif v is BaseMGDBDataModel: # 存在
-                        setattr(self, k, v().load_db_data(db_value.get(k), strict_mode))
-                    else:
-                        setattr(self, k, db_value.get(k))
+            for k, loader in self.__class__._prepared()._db_plan:
+                v = db_value.get(k, _MISSING)
+                if v is not _MISSING:
+                    setattr(self, k, loader(v, strict_mode))
         else:
             raise ValueError("不支持该数据类型:", db_value)
         return self
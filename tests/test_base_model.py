@@ -0,0 +1,318 @@
+'''base_model的行为测试，不依赖_base_model_fast'''
+import datetime
+import decimal
+import enum
+import json
+import unittest
+from unittest import mock
+
+from model import base_model
+from model.base_model import (
+    BaseDataModel, BaseStrictDataModel, ComplexValueModel, DateTimeIntValueModel, DateTimeValueModel, FixedValueModel,
+    LimitedValueModel, ListComplexValueModel, NumberBetweenValueModel, StringLimitedValueModel)
+
+
+class NumberBetweenValueModelTest(unittest.TestCase):
+
+    def test_apply_upper_bound(self):
+        model = NumberBetweenValueModel(1, 0, 10)
+        self.assertEqual(model.apply(10), 10)
+        self.assertEqual(model.apply(5), 5)
+        self.assertEqual(model.value(), 5)
+        with self.assertRaises(ValueError):
+            model.apply(11)
+        with self.assertRaises(ValueError):
+            model.apply(-1)
+        self.assertEqual(model.value(), 5)
+
+    def test_apply_big_int_bound(self):
+        model = NumberBetweenValueModel(0, 0, 2 ** 70)
+        self.assertEqual(model.apply(2 ** 69), 2 ** 69)
+
+    def test_apply_batch_without_numpy(self):
+        model = NumberBetweenValueModel(1, 0, 10)
+        with mock.patch.object(base_model, "numpy", None):
+            self.assertEqual(model.apply_batch([0, 10]), [0, 10])
+            with self.assertRaisesRegex(ValueError, "value: 11"):
+                model.apply_batch([1, 11])
+
+    @unittest.skipIf(base_model.numpy is None, "numpy未安装")
+    def test_apply_batch(self):
+        numpy = base_model.numpy
+        model = NumberBetweenValueModel(1, 0, 10)
+        values = numpy.array([0, 5, 10])
+        self.assertIs(model.apply_batch(values), values)
+        self.assertEqual(model.value(), 1)
+        self.assertEqual(model.apply_batch(numpy.array([0.5, 9.5])).tolist(), [0.5, 9.5])
+        with self.assertRaisesRegex(ValueError, "value: 11"):
+            model.apply_batch(numpy.array([1, 11, 12]))
+        with self.assertRaisesRegex(ValueError, "value: -1"):
+            model.apply_batch(numpy.array([-1.0, 2.0]))
+
+    @unittest.skipIf(base_model.numpy is None, "numpy未安装")
+    def test_apply_batch_bounds_outside_dtype(self):
+        numpy = base_model.numpy
+        model = NumberBetweenValueModel(0, 0, 2 ** 70)
+        self.assertEqual(model.apply_batch(numpy.array([1, 2])).tolist(), [1, 2])
+        with self.assertRaises(ValueError):
+            model.apply_batch(numpy.array([1, -2]))
+        model = NumberBetweenValueModel(0, -1, 10)
+        self.assertEqual(model.apply_batch(numpy.array([1, 2], dtype=numpy.uint8)).tolist(), [1, 2])
+        model = NumberBetweenValueModel(0, 0.5, 10)
+        with self.assertRaises(ValueError):
+            model.apply_batch(numpy.array([0, 2]))
+
+    @unittest.skipIf(base_model.numpy is None, "numpy未安装")
+    def test_apply_batch_non_numeric(self):
+        model = NumberBetweenValueModel(decimal.Decimal(1), decimal.Decimal(0), decimal.Decimal(10))
+        self.assertEqual(model.apply_batch([decimal.Decimal(3), 2 ** 3]), [decimal.Decimal(3), 8])
+        with self.assertRaises(ValueError):
+            model.apply_batch([decimal.Decimal("10.5")])
+        model = NumberBetweenValueModel("b", "a", "c")
+        self.assertEqual(model.apply_batch(["a", "c"]), ["a", "c"])
+        with self.assertRaisesRegex(ValueError, "value: d"):
+            model.apply_batch(["a", "d"])
+
+
+
+class _Color(enum.Enum):
+    R = 1
+
+
+class _JsonModel(BaseDataModel):
+    DATA_DEFAULT_FORMAT = {"a": 0, "m": {}}
+
+
+class ToJsonTest(unittest.TestCase):
+
+    def test_same_as_json(self):
+        model = _JsonModel(a=1)
+        model.m = {"x": [1, "中"], 1: 2, None: 3}
+        self.assertEqual(json.loads(model.to_json()), json.loads(json.dumps(model.to_dict())))
+
+    def test_rejected_keys(self):
+        for key in (datetime.datetime(2020, 1, 1), _Color.R):
+            model = _JsonModel()
+            model.m = {key: 1}
+            with self.assertRaises(TypeError):
+                model.to_json()
+
+    def test_to_dict_override(self):
+        class Model(_JsonModel):
+            def to_dict(self):
+                return dict(super().to_dict(), extra="computed")
+        self.assertEqual(json.loads(Model(a=2).to_json()), {"a": 2, "m": {}, "extra": "computed"})
+
+
+
+class ReassignFormatTest(unittest.TestCase):
+    '''类创建后整体重新赋值DATA_DEFAULT_FORMAT/EQUALS_IGNORE_KEYS，已有实例同样生效'''
+
+    def setUp(self):
+        class Parent(BaseDataModel):
+            DATA_DEFAULT_FORMAT = {"a": 0, "ts": 0}
+
+        class Child(Parent):
+            pass
+
+        self.Parent, self.Child = Parent, Child
+
+    def test_equals_ignore_keys(self):
+        parent, child = self.Parent(), self.Child()
+        self.assertFalse(parent.equals({"a": 0, "ts": 2}))
+        self.Parent.EQUALS_IGNORE_KEYS = ["ts"]
+        self.assertTrue(parent.equals({"a": 0, "ts": 2}))
+        self.assertTrue(child.equals({"a": 0, "ts": 2}))
+
+    def test_data_default_format(self):
+        parent, child = self.Parent(), self.Child()
+        self.Parent.DATA_DEFAULT_FORMAT = {"a": 0, "ts": 0, "name": ""}
+        parent.name = 1 # 类型不一致，忽略
+        self.assertNotIn("name", parent.__dict__)
+        child.name = "x"
+        self.assertEqual(child.to_dict(), {"a": 0, "ts": 0, "name": "x"})
+        self.assertEqual(self.Child().to_dict(), {"a": 0, "ts": 0, "name": ""})
+
+    def test_list_complex_value(self):
+        model = ListComplexValueModel([{"a": 1, "ts": 2}], value_cls=self.Child)
+        self.assertEqual(model.value(), [{"a": 1, "ts": 2}])
+        self.Parent.DATA_DEFAULT_FORMAT = {"a": 0, "ts": 0, "name": ""}
+        with self.assertRaises(AssertionError):
+            model.value()
+
+
+
+class DefaultValueTest(unittest.TestCase):
+
+    def test_types(self):
+        default_value = BaseDataModel.default_value
+        self.assertEqual(default_value(str), "")
+        self.assertEqual(default_value(int), 0)
+        self.assertEqual(default_value(float), 0.0)
+        self.assertEqual(default_value(list), [])
+        self.assertEqual(default_value(dict), {})
+        self.assertIsNone(default_value(object))
+
+    def test_values(self):
+        default_value = BaseDataModel.default_value
+        self.assertEqual(default_value("abc"), "")
+        self.assertEqual(default_value(5), 0)
+        self.assertEqual(default_value(1.5), 0.0)
+        self.assertEqual(default_value([1]), [])
+        self.assertEqual(default_value({"a": 1, "b": [2], "c": {"d": "x"}}), {"a": 0, "b": [], "c": {"d": ""}})
+        self.assertIsInstance(default_value(datetime.datetime(2020, 1, 1)), datetime.datetime)
+        self.assertEqual(default_value(StringLimitedValueModel("abc")), "abc")
+        self.assertIsNone(default_value(None))
+
+
+class _Item(BaseDataModel):
+    DATA_DEFAULT_FORMAT = {"x": 0, "y": ""}
+
+
+class _StrictItem(BaseStrictDataModel):
+    DATA_DEFAULT_FORMAT = {"x": 0, "y": ""}
+
+
+class ListComplexValueModelTest(unittest.TestCase):
+
+    def test_model_values(self):
+        self.assertEqual(len(ListComplexValueModel([_Item(), _Item()], value_cls=_Item).value()), 2)
+        with self.assertRaises(AssertionError):
+            ListComplexValueModel(["x"], value_cls=_Item).value()
+
+    def test_dict_values(self):
+        # 非严格模式：dict的key包含DATA_DEFAULT_FORMAT的全部key即可
+        self.assertEqual(ListComplexValueModel([{"x": 1, "y": ""}], value_cls=_Item).value(), [{"x": 1, "y": ""}])
+        self.assertEqual(ListComplexValueModel([{"x": 1, "y": "", "z": 2}], value_cls=_Item).value()[0]["z"], 2)
+        with self.assertRaises(AssertionError):
+            ListComplexValueModel([{"x": 1}], value_cls=_Item).value()
+        # 严格模式：key必须一致
+        self.assertEqual(len(ListComplexValueModel([{"x": 1, "y": ""}], value_cls=_StrictItem).value()), 1)
+        with self.assertRaises(AssertionError):
+            ListComplexValueModel([{"x": 1, "y": "", "z": 2}], value_cls=_StrictItem).value()
+        self.assertEqual(len(ListComplexValueModel([{"z": 1}], value_cls=_Item, support_dict_value=True).value()), 1)
+
+    def test_required(self):
+        self.assertEqual(ListComplexValueModel().value(), [])
+        self.assertEqual(ListComplexValueModel([1], required=True, need_size=True).value(), [1])
+        with self.assertRaises(AssertionError):
+            ListComplexValueModel(required=True, need_size=True).value()
+
+
+class DateTimeValueModelTest(unittest.TestCase):
+
+    def test_apply_same_as_strptime(self):
+        cases = [
+            ("%Y-%m-%d", "2021-03-04"),
+            ("%Y-%m-%d %H:%M:%S", "2021-03-04 05:06:07"),
+            ("%Y-%m-%dT%H:%M:%S", "2021-03-04T05:06:07"),
+            ("%Y-%m-%d", "2021-3-4"), # 非ISO格式，使用strptime
+            ("%Y/%m/%d", "2021/03/04"),
+        ]
+        for formatter, text in cases:
+            model = DateTimeValueModel(formatter)
+            self.assertEqual(model.apply(text), text)
+            self.assertEqual(model.default_value, datetime.datetime.strptime(text, formatter))
+            self.assertEqual(model.value(), datetime.datetime.strptime(text, formatter).strftime(formatter))
+
+    def test_apply_invalid(self):
+        # fromisoformat可以解析但strptime不接受的字符串同样抛出ValueError
+        for formatter, text in [("%Y-%m-%d", "2021-02-30"), ("%Y-%m-%d", "20210304xx"),
+                                ("%Y-%m-%d %H:%M:%S", "2021-03-04 05:06:0x"), ("%Y-%m-%d", "2021-03-04T05")]:
+            with self.assertRaises(ValueError):
+                DateTimeValueModel(formatter).apply(text)
+
+    def test_value_after_reapply(self):
+        model = DateTimeValueModel("%Y-%m-%d", datetime.datetime(2020, 1, 2))
+        self.assertEqual(model.value(), "2020-01-02")
+        model.apply("2021-03-04")
+        self.assertEqual(model.value(), "2021-03-04")
+        model.formatter = "%Y"
+        self.assertEqual(model.value(), "2021")
+
+
+class _DictValueModel(StringLimitedValueModel):
+    # 未定义__slots__，属性保存在__dict__中
+    def __init__(self, default_value):
+        super().__init__(default_value)
+        self.extra = {"k": [1]}
+
+
+class _PrivateSlotValueModel(LimitedValueModel):
+    __slots__ = ("__secret",)
+
+    def __init__(self, default_value, secret):
+        super().__init__(default_value)
+        self.__secret = secret
+
+    def secret(self):
+        return self.__secret
+
+
+class CloneTest(unittest.TestCase):
+
+    def test_independent_default_value(self):
+        model = ListComplexValueModel([[1], {"a": [2]}], value_cls=list, need_size=True)
+        clone = model.clone()
+        self.assertIs(type(clone), ListComplexValueModel)
+        self.assertEqual(clone.default_value, model.default_value)
+        clone.default_value[0].append(3)
+        clone.default_value[1]["a"].append(4)
+        self.assertEqual(model.default_value, [[1], {"a": [2]}])
+        self.assertIs(clone.value_cls, list)
+        self.assertTrue(clone.need_size)
+
+    def test_slots(self):
+        model = DateTimeValueModel("%Y-%m-%d", datetime.datetime(2020, 1, 2), required=True)
+        clone = model.clone()
+        self.assertEqual((clone.formatter, clone.required, clone.value()), ("%Y-%m-%d", True, "2020-01-02"))
+        clone.apply("2021-03-04")
+        self.assertEqual(model.value(), "2020-01-02")
+
+    def test_private_slots(self):
+        clone = _PrivateSlotValueModel("a", [1]).clone()
+        self.assertEqual((clone.value(), clone.secret()), ("a", [1]))
+
+    def test_dict_attributes(self):
+        model = _DictValueModel("a")
+        clone = model.clone()
+        clone.extra["k"].append(2)
+        self.assertEqual(model.extra, {"k": [1]})
+        self.assertEqual(clone.value(), "a")
+
+    def test_model_defaults_not_shared(self):
+        class Model(BaseDataModel):
+            DATA_DEFAULT_FORMAT = {"tags": [], "meta": {"a": []}, "lst": ListComplexValueModel()}
+        a, b = Model(), Model()
+        a.tags.append(1)
+        a.meta["a"].append(1)
+        a.lst.default_value.append(1)
+        self.assertEqual(b.to_dict(), {"tags": [], "meta": {"a": []}, "lst": []})
+
+
+class HashTest(unittest.TestCase):
+
+    def test_hash_default_value(self):
+        model = StringLimitedValueModel("abc")
+        self.assertEqual(hash(model), hash("abc"))
+        self.assertEqual({model: 1}["abc"], 1)
+        self.assertIn(NumberBetweenValueModel(5, 0, 10), {5})
+
+    def test_value_not_called(self):
+        # value()校验失败时同样可以hash
+        self.assertEqual(hash(ComplexValueModel(required=True)), hash(None))
+        self.assertEqual(hash(FixedValueModel(1, value_cls=str)), hash(1))
+
+    def test_unhashable_default_value(self):
+        for model in (LimitedValueModel(([1],)), ListComplexValueModel([1])):
+            self.assertEqual(hash(model), hash(model))
+            self.assertIn(model, {model})
+
+    def test_datetime_unhashable(self):
+        for model in (DateTimeValueModel("%Y-%m-%d"), DateTimeIntValueModel()):
+            with self.assertRaises(TypeError):
+                hash(model)
+
+
+if __name__ == "__main__":
+    unittest.main()
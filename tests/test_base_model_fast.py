@@ -0,0 +1,129 @@
+'''
+_base_model_fast(Cython)与_PyBaseDataModelImpl(纯Python)的一致性检查。
+同一组操作分别在两种实现上执行，比较结果与异常。需要先编译:
+    cythonize -i model/_base_model_fast.pyx
+    python -m unittest tests.test_base_model_fast
+'''
+import importlib.util
+import sys
+import unittest
+
+import model
+from model import base_model
+
+_MISSING = object()
+
+
+def _load_pure_base_model():
+    '''加载一份不使用_base_model_fast的base_model'''
+    name = "model._base_model_fast"
+    saved_module = sys.modules.get(name, _MISSING)
+    saved_attr = model.__dict__.pop("_base_model_fast", _MISSING)
+    sys.modules[name] = None # import时抛出ImportError
+    try:
+        spec = importlib.util.spec_from_file_location("model._base_model_py", base_model.__file__)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        if saved_module is _MISSING:
+            del sys.modules[name]
+        else:
+            sys.modules[name] = saved_module
+        if saved_attr is not _MISSING:
+            model._base_model_fast = saved_attr
+    return module
+
+
+def _outcome(fn):
+    '''执行fn，返回结果或 (异常类型名, 异常信息)'''
+    try:
+        return fn()
+    except Exception as e:
+        return type(e).__name__, str(e)
+
+
+def _run_scenario(bm):
+    '''在bm(某一实现的base_model)上执行同一组操作，返回可比较的结果'''
+    import datetime
+
+    class Sub(bm.BaseDataModel):
+        DATA_DEFAULT_FORMAT = {"x": 0, "y": ""}
+
+    class Model(bm.BaseDataModel):
+        DATA_DEFAULT_FORMAT = {
+            "name": "", "age": 0, "flag": False, "rate": 0.0, "t": str, "sub": Sub,
+            "nested": {}, "free": None, "tags": [], "meta": {"a": 1, "b": []},
+            "lv": bm.StringLimitedValueModel("abc"), "num": bm.NumberBetweenValueModel(1, 0, 10),
+            "dt": bm.DateTimeValueModel("%Y-%m-%d", datetime.datetime(2021, 3, 4)),
+            "lst": bm.ListComplexValueModel(),
+        }
+
+    class Strict(bm.BaseStrictDataModel):
+        DATA_DEFAULT_FORMAT = {"a": 0}
+
+    results = []
+    results.append(_outcome(lambda: Model().to_dict()))
+    m = Model(t="s", sub=Sub())
+    results.append(_outcome(m.to_dict))
+    assignments = [
+        ("name", "n"), ("name", 1), ("age", 3), ("age", True), ("age", "3"), ("flag", 1), ("flag", True),
+        ("rate", 1), ("t", 1), ("sub", {"x": 1}), ("sub", Sub(x=2)),
+        ("nested", {"k": [1, {"z": 2}]}), ("nested", Sub(y="q")), ("nested", [1]), ("free", {"a": Sub()}),
+        ("tags", [1, "a", [2]]), ("tags", (1,)), ("meta", {"a": 2}), ("lv", "xyz"), ("num", 7), ("num", 11),
+        ("dt", "2022-05-06"), ("extra", [Sub()]), ("to_dict", 1), ("_factory", None), ("t", int), ("t", "u"),
+    ]
+    for key, value in assignments:
+        results.append((key, _outcome(lambda: setattr(m, key, value)), _outcome(m.to_dict)))
+    results.append(_outcome(m.to_json))
+    results.append(_outcome(lambda: m.check() and None))
+
+    # 值的类型与DATA_DEFAULT_FORMAT不一致时走通用转换
+    m.__dict__.update(name=bm.StringLimitedValueModel("v"), age=1.5, sub={"x": Sub()}, tags="s")
+    results.append(_outcome(m.to_dict))
+    m.__dict__["t"] = str
+    results.append(_outcome(m.to_dict))
+
+    # 自引用与过深的嵌套：抛出RecursionError，不能使解释器崩溃
+    m.t = "s"
+    m.tags = [1]
+    m.tags.append(m.tags)
+    results.append(_outcome(m.to_dict))
+    results.append(_outcome(lambda: m.check() and None))
+    deep = []
+    m.tags = deep
+    for _ in range(5000):
+        deep.append([])
+        deep = deep[0]
+    results.append(_outcome(m.to_dict))
+    deep = m.tags = []
+    for _ in range(200000):
+        deep.append([])
+        deep = deep[0]
+    results.append(_outcome(m.to_dict))
+    loop = Sub()
+    m.nested = loop
+    loop.extra = {"self": loop}
+    results.append(_outcome(m.to_dict))
+
+    s = Strict()
+    results.append(_outcome(lambda: setattr(s, "a", 1)))
+    results.append(_outcome(lambda: setattr(s, "b", 1)))
+    results.append(_outcome(s.to_dict))
+    return results
+
+
+@unittest.skipIf(base_model._base_model_fast is None, "_base_model_fast未编译或版本不一致")
+class FastImplParityTest(unittest.TestCase):
+
+    def test_impl(self):
+        pure = _load_pure_base_model()
+        self.assertIs(pure._BaseDataModelImpl, pure._PyBaseDataModelImpl)
+        self.assertIs(base_model._BaseDataModelImpl, base_model._base_model_fast._BaseDataModelImpl)
+
+    def test_parity(self):
+        pure = _load_pure_base_model()
+        self.assertEqual(_run_scenario(base_model), _run_scenario(pure))
+
+
+if __name__ == "__main__":
+    unittest.main()